@@ -0,0 +1,29 @@
+# ----------------------------- IMPORTS -----------------------------
+import hashlib
+from threading import Lock
+
+from cachetools import LRUCache
+from passlib.context import CryptContext
+
+# ----------------------------- PASSWORD HASHING -----------------------------
+pwd_context = CryptContext(schemes=["argon2", "hex_sha256"], deprecated="auto")
+_verified_passwords: LRUCache = LRUCache(maxsize=1024)
+_verified_passwords_lock = Lock()
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(password: str, password_hash: str) -> bool:
+    key = (password_hash, hashlib.blake2b(password.encode(), digest_size=16).digest())
+    with _verified_passwords_lock:
+        if key in _verified_passwords:
+            return True
+    try:
+        verified = pwd_context.verify(password, password_hash)
+    except ValueError:
+        return False
+    if not verified:
+        return False
+    with _verified_passwords_lock:
+        _verified_passwords[key] = True
+    return True
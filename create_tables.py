@@ -1,11 +1,57 @@
 # ----------------------------- IMPORTS -----------------------------
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+
 from database import Base, engine
 from models import Director, Genre, Movie, Review, Show, User
 
+# ----------------------------- SCHEMA UPGRADE -----------------------------
+def find_missing_schema(inspector, tables):
+    if not tables:
+        return [], []
+    names = [t.name for t in tables]
+    columns = inspector.get_multi_columns(filter_names=names)
+    indexes = inspector.get_multi_indexes(filter_names=names)
+
+    missing_columns = []
+    missing_indexes = []
+    for table in tables:
+        existing_columns = {c["name"] for c in columns.get((None, table.name), [])}
+        existing_indexes = {i["name"] for i in indexes.get((None, table.name), [])}
+        missing_columns += [c for c in table.columns if c.name not in existing_columns]
+        missing_indexes += [i for i in table.indexes if i.name not in existing_indexes]
+    return missing_columns, missing_indexes
+
+def upgrade_existing_tables(columns, indexes):
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in columns:
+            print(f"Adding column {column.table.name}.{column.name}...")
+            spec = CreateColumn(column).compile(dialect=engine.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {column.table.name} ADD COLUMN {spec}")
+        for index in indexes:
+            print(f"Creating index {index.name}...")
+            index.create(bind=conn)
+
 # ----------------------------- MAIN FUNCTION -----------------------------
 def main():
-    print("Creating tables...")
-    Base.metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    missing = [t for t in Base.metadata.sorted_tables if t.name not in existing]
+    missing_columns, missing_indexes = find_missing_schema(
+        inspector, [t for t in Base.metadata.sorted_tables if t.name in existing]
+    )
+
+    if not missing and not missing_columns and not missing_indexes:
+        print("All tables already exist.")
+        return
+
+    if missing_columns or missing_indexes:
+        upgrade_existing_tables(missing_columns, missing_indexes)
+
+    if missing:
+        print("Creating tables...")
+        Base.metadata.create_all(bind=engine, tables=missing, checkfirst=False)
     print("Done.")
 
 # ----------------------------- EXECUTION ENTRY POINT -----------------------------
@@ -1,50 +1,123 @@
 # ----------------------------- IMPORTS -----------------------------
-from typing import List, Optional
+from threading import Lock
+from typing import Dict, List, Optional
+from cachetools import TTLCache
+from sqlalchemy import ARRAY, Row, String, delete, event, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from models import Movie, Director, Genre
+from sqlalchemy.orm.attributes import set_committed_value
+from models import Movie, Director, Genre, movie_genre_association
 
 # ----------------------------- DIRECTOR HELPERS -----------------------------
 def get_director_by_id(db: Session, director_id: int) -> Optional[Director]:
     return db.query(Director).filter(Director.id == director_id).first()
 
-def get_director_by_name(db: Session, name: str) -> Optional[Director]:
-    return db.query(Director).filter(Director.name.ilike(name)).first()
-
 def get_or_create_director_by_name(db: Session, name: str) -> Director:
     clean_name = name.strip()
-    director = get_director_by_name(db, clean_name)
+    cache = db.info.setdefault("director_cache", {})
+    director = cache.get(clean_name.lower())
     if director:
         return director
-    director = Director(name=clean_name)
-    db.add(director)
-    db.commit()
-    db.refresh(director)
+    director = db.execute(
+        pg_insert(Director)
+        .values(name=clean_name)
+        .on_conflict_do_update(
+            index_elements=[func.lower(Director.name)],
+            set_={"name": Director.__table__.c.name},
+        )
+        .returning(Director)
+    ).scalar_one()
+    cache[clean_name.lower()] = director
     return director
 
 # ----------------------------- GENRE HELPERS -----------------------------
+_genre_cache: TTLCache = TTLCache(maxsize=1, ttl=60)
+_genre_cache_lock = Lock()
+
+def get_all_genres(db: Session) -> List[Row]:
+    with _genre_cache_lock:
+        genres = _genre_cache.get("all")
+    if genres is None:
+        genres = db.query(Genre.id, Genre.name).all()
+        with _genre_cache_lock:
+            _genre_cache["all"] = genres
+    return genres
+
+def clear_genre_cache() -> None:
+    with _genre_cache_lock:
+        _genre_cache.clear()
+
+@event.listens_for(Session, "after_commit")
+def _clear_genre_cache_on_commit(session: Session) -> None:
+    if session.info.pop("genres_changed", False):
+        clear_genre_cache()
+
 def get_genres_by_ids(db: Session, genre_ids: List[int]) -> List[Genre]:
     if not genre_ids:
         return []
     return db.query(Genre).filter(Genre.id.in_(genre_ids)).all()
 
 def get_or_create_genres_by_names(db: Session, names: List[str]) -> List[Genre]:
-    genres: List[Genre] = []
+    clean_names: Dict[str, str] = {}
     for name in names:
         clean = name.strip()
-        if not clean:
-            continue
-        genre = db.query(Genre).filter(Genre.name.ilike(clean)).first()
-        if not genre:
-            genre = Genre(name=clean)
-            db.add(genre)
-            db.commit()
-            db.refresh(genre)
-        genres.append(genre)
-    return genres
+        if clean:
+            clean_names.setdefault(clean.lower(), clean)
+    if not clean_names:
+        return []
+
+    cache = db.info.setdefault("genre_cache", {})
+    by_key = {key: cache[key] for key in clean_names if key in cache}
+
+    uncached = [key for key in clean_names if key not in by_key]
+    if uncached:
+        existing = db.execute(
+            select(Genre).where(func.lower(Genre.name).in_(uncached))
+        ).scalars().all()
+        by_key.update({g.name.lower(): g for g in existing})
+
+    missing = [key for key in clean_names if key not in by_key]
+    if missing:
+        created = db.execute(
+            pg_insert(Genre)
+            .values([{"name": clean_names[key]} for key in missing])
+            .on_conflict_do_update(
+                index_elements=[func.lower(Genre.name)],
+                set_={"name": Genre.__table__.c.name},
+            )
+            .returning(Genre)
+        ).scalars().all()
+        by_key.update({g.name.lower(): g for g in created})
+        db.info["genres_changed"] = True
+
+    cache.update(by_key)
+    return [by_key[key] for key in clean_names]
+
+# ----------------------------- MOVIE GENRE LINKS -----------------------------
+def _link_movie_genres(db: Session, movie_id: int, genres: List[Genre]) -> None:
+    if not genres:
+        return
+    db.execute(
+        insert(movie_genre_association),
+        [{"movie_id": movie_id, "genre_id": g.id} for g in genres],
+    )
 
 # ----------------------------- MOVIE CRUD (ID-BASED, USED BY API) -----------------------------
-def get_movies(db: Session) -> List[Movie]:
-    return db.query(Movie).all()
+def get_movie_rows(db: Session) -> List[Row]:
+    return db.execute(
+        select(
+            Movie.id,
+            Movie.title,
+            Movie.year,
+            Movie.description,
+            Director.name.label("director"),
+            func.array_remove(func.array_agg(Genre.name), None, type_=ARRAY(String)).label("genres"),
+            Movie.image_url,
+        )
+        .outerjoin(Movie.director)
+        .outerjoin(Movie.genres)
+        .group_by(Movie.id, Director.name)
+    ).all()
 
 def get_movie(db: Session, movie_id: int) -> Optional[Movie]:
     return db.query(Movie).filter(Movie.id == movie_id).first()
@@ -64,18 +137,23 @@ def create_movie(
 
     genres = get_genres_by_ids(db, genre_ids)
 
-    movie = Movie(
-        title=title,
-        year=year,
-        description=description,
-        director=director,
-        image_url=image_url,
-    )
-    movie.genres = genres
+    movie = db.execute(
+        insert(Movie)
+        .values(
+            title=title,
+            year=year,
+            description=description,
+            director_id=director.id,
+            image_url=image_url,
+        )
+        .returning(Movie)
+    ).scalar_one()
+
+    _link_movie_genres(db, movie.id, genres)
+    set_committed_value(movie, "director", director)
+    set_committed_value(movie, "genres", genres)
 
-    db.add(movie)
     db.commit()
-    db.refresh(movie)
     return movie
 
 def update_movie(
@@ -88,25 +166,35 @@ def update_movie(
     genre_ids: List[int],
     image_url: Optional[str] = None,
 ) -> Optional[Movie]:
-    movie = get_movie(db, movie_id)
-    if not movie:
-        return None
-
     director = get_director_by_id(db, director_id)
     if not director:
         raise ValueError("Director not found")
 
     genres = get_genres_by_ids(db, genre_ids)
 
-    movie.title = title
-    movie.year = year
-    movie.description = description
-    movie.director = director
-    movie.image_url = image_url
-    movie.genres = genres
+    movie = db.execute(
+        update(Movie)
+        .where(Movie.id == movie_id)
+        .values(
+            title=title,
+            year=year,
+            description=description,
+            director_id=director.id,
+            image_url=image_url,
+        )
+        .returning(Movie)
+    ).scalar_one_or_none()
+    if movie is None:
+        return None
+
+    db.execute(
+        delete(movie_genre_association).where(movie_genre_association.c.movie_id == movie_id)
+    )
+    _link_movie_genres(db, movie_id, genres)
+    set_committed_value(movie, "director", director)
+    set_committed_value(movie, "genres", genres)
 
     db.commit()
-    db.refresh(movie)
     return movie
 
 def delete_movie(db: Session, movie_id: int) -> bool:
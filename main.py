@@ -1,45 +1,118 @@
 # ----------------------------- IMPORTS -----------------------------
 import hashlib
+import hmac
+import os
+import re
+import secrets
+from dataclasses import dataclass
+from threading import Lock
 from typing import Optional, List
 
+from cachetools import TTLCache
 from fastapi import FastAPI, Request, Depends, Form, HTTPException, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 from pydantic import BaseModel
+from sqlalchemy import bindparam, lambda_stmt, select
+from sqlalchemy.orm import selectinload
 from sqlalchemy.sql import func
 
-from database import SessionLocal
+from auth import hash_password, pwd_context, verify_password
+from database import ReadSessionLocal, SessionLocal
 import crud
 from models import Director, Genre, Movie, Review, User
 
 # ----------------------------- APP INITIALIZATION -----------------------------
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # ----------------------------- DATABASE DEPENDENCY -----------------------------
 def get_db():
     db = SessionLocal()
+    db.info["director_cache"] = {}
+    db.info["genre_cache"] = {}
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db():
+    db = ReadSessionLocal()
     try:
         yield db
     finally:
         db.close()
 
 # ----------------------------- AUTH HELPERS -----------------------------
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+SECRET_KEY = os.getenv("SECRET_KEY") or secrets.token_hex(32)
+
+def _user_id_signature(user_id: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), user_id.encode(), hashlib.sha256).hexdigest()
+
+def sign_user_id(user_id: int) -> str:
+    return f"{user_id}.{_user_id_signature(str(user_id))}"
+
+def read_user_id(cookie: Optional[str]) -> Optional[int]:
+    if not cookie:
+        return None
+    user_id, _, signature = cookie.partition(".")
+    if not hmac.compare_digest(_user_id_signature(user_id).encode(), signature.encode()):
+        return None
+    return int(user_id)
+
+@dataclass(frozen=True)
+class CurrentUser:
+    id: int
+    username: str
 
-def verify_password(password: str, password_hash: str) -> bool:
-    return hash_password(password) == password_hash
+_user_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+_user_cache_lock = Lock()
 
-def get_current_user(request: Request, db=Depends(get_db)) -> Optional[User]:
-    username = request.cookies.get("username")
-    if not username:
+def cache_current_user(user: User) -> CurrentUser:
+    current = CurrentUser(id=user.id, username=user.username)
+    with _user_cache_lock:
+        _user_cache[user.id] = current
+    return current
+
+def forget_current_user(user_id: int) -> None:
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+def get_current_user(request: Request) -> Optional[CurrentUser]:
+    user_id = read_user_id(request.cookies.get("uid"))
+    if user_id is None:
         return None
-    return db.query(User).filter(User.username == username).first()
+    with _user_cache_lock:
+        current = _user_cache.get(user_id)
+    if current:
+        return current
+    with ReadSessionLocal() as db:
+        user = db.get(User, user_id)
+        if not user:
+            return None
+        return cache_current_user(user)
+
+# ----------------------------- PAGINATION -----------------------------
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
 # ----------------------------- TEMPLATE & STATIC SETUP -----------------------------
+HASHED_ASSET = re.compile(r"\.[0-9a-f]{8,}\.(css|js|png)$")
+
+class CachedStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if HASHED_ASSET.search(str(full_path)):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "public, max-age=3600"
+        return response
+
 templates = Jinja2Templates(directory="templates")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+templates.env.auto_reload = os.getenv("TEMPLATES_AUTO_RELOAD") == "1"
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 # ----------------------------- Pydantic SCHEMAS (API) -----------------------------
 class MovieCreate(BaseModel):
@@ -64,7 +137,7 @@ class MovieOut(BaseModel):
 
 # ----------------------------- API HELPERS -----------------------------
 def movie_to_out(movie: Movie) -> MovieOut:
-    return MovieOut(
+    return MovieOut.model_construct(
         id=movie.id,
         title=movie.title,
         year=movie.year,
@@ -78,45 +151,59 @@ def movie_to_out(movie: Movie) -> MovieOut:
 @app.get("/", response_class=HTMLResponse)
 def home(
     request: Request,
-    db=Depends(get_db),
+    db=Depends(get_read_db),
     q: str = "",
     genre: str = "",
     sort: str = "title",
-    user: Optional[User] = Depends(get_current_user),
+    page: int = 1,
+    page_size: int = PAGE_SIZE,
+    user: Optional[CurrentUser] = Depends(get_current_user),
 ):
-    query = db.query(Movie).join(Movie.director).outerjoin(Movie.genres)
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+
+    stmt = lambda_stmt(
+        lambda: select(Movie, func.avg(Review.rating).label("avg_rating"))
+        .join(Movie.director)
+        .outerjoin(Movie.reviews)
+        .group_by(Movie.id)
+        .options(selectinload(Movie.director), selectinload(Movie.genres))
+    )
+
+    params = {}
 
     if q:
-        query = query.filter(
-            (Movie.title.ilike(f"%{q}%"))
-            | (Movie.description.ilike(f"%{q}%"))
-            | (Director.name.ilike(f"%{q}%"))
-            | (Genre.name.ilike(f"%{q}%"))
+        stmt += lambda s: s.where(
+            (Movie.search_vec.op("@@")(func.plainto_tsquery("english", bindparam("q"))))
+            | (Director.name.ilike(bindparam("q_like")))
+            | (Movie.genres.any(Genre.name.ilike(bindparam("q_like"))))
         )
+        params.update(q=q, q_like=f"%{q}%")
 
     if genre:
-        query = query.filter(Genre.name.ilike(f"%{genre}%"))
+        stmt += lambda s: s.where(Movie.genres.any(Genre.name.ilike(bindparam("genre_like"))))
+        params["genre_like"] = f"%{genre}%"
 
     if sort == "year":
-        query = query.order_by(Movie.year)
+        stmt += lambda s: s.order_by(Movie.year, Movie.id)
     elif sort == "rating":
-        query = (
-            query.outerjoin(Movie.reviews)
-            .group_by(Movie.id)
-            .order_by(func.avg(Review.rating).desc())
-        )
+        stmt += lambda s: s.order_by(func.avg(Review.rating).desc().nulls_last(), Movie.id)
     else:
-        query = query.order_by(Movie.title)
+        stmt += lambda s: s.order_by(Movie.title, Movie.id)
 
-    movies = query.all()
+    offset = (page - 1) * page_size
+    limit = page_size + 1
+    stmt += lambda s: s.offset(offset).limit(limit)
 
-    for movie in movies:
-        if movie.reviews:
-            movie.avg_rating = sum(r.rating for r in movie.reviews) / len(movie.reviews)
-        else:
-            movie.avg_rating = None
+    rows = db.execute(stmt, params).all()
+    has_next = len(rows) > page_size
 
-    genres = db.query(Genre).all()
+    movies = []
+    for movie, avg_rating in rows[:page_size]:
+        movie.avg_rating = avg_rating
+        movies.append(movie)
+
+    genres = crud.get_all_genres(db)
 
     return templates.TemplateResponse(
         "index.html",
@@ -127,6 +214,9 @@ def home(
             "genre": genre,
             "sort": sort,
             "genres": genres,
+            "page": page,
+            "page_size": page_size,
+            "has_next": has_next,
             "user": user,
         },
     )
@@ -136,7 +226,7 @@ def home(
 def show_login(
     request: Request,
     next: str = "/",
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CurrentUser] = Depends(get_current_user),
 ):
     if user:
         return RedirectResponse(url=next, status_code=303)
@@ -165,36 +255,36 @@ def handle_login(
             status_code=400,
         )
 
+    if pwd_context.needs_update(user.password_hash):
+        user.password_hash = hash_password(password)
+        db.commit()
+
+    cache_current_user(user)
     response = RedirectResponse(url=next or "/", status_code=303)
-    response.set_cookie("username", user.username, httponly=True)
+    response.set_cookie("uid", sign_user_id(user.id), httponly=True)
     return response
 
 @app.get("/logout")
-def logout():
+def logout(request: Request):
+    user_id = read_user_id(request.cookies.get("uid"))
+    if user_id is not None:
+        forget_current_user(user_id)
     response = RedirectResponse(url="/", status_code=303)
-    response.delete_cookie("username")
+    response.delete_cookie("uid")
     return response
 
 # ---------- Add movie (HTML) ----------
 @app.get("/add", response_class=HTMLResponse)
 def show_add_movie_form(
     request: Request,
-    db=Depends(get_db),
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CurrentUser] = Depends(get_current_user),
 ):
     if not user:
         return RedirectResponse(url="/login?next=/add", status_code=303)
 
-    directors = db.query(Director).all()
-    genres = db.query(Genre).all()
     return templates.TemplateResponse(
         "add_movie.html",
-        {
-            "request": request,
-            "directors": directors,
-            "genres": genres,
-            "user": user,
-        },
+        {"request": request, "user": user},
     )
 
 @app.post("/add", response_class=HTMLResponse)
@@ -207,7 +297,7 @@ def handle_add_movie(
     genre_name: str = Form(""),
     image_url: str = Form(""),
     db=Depends(get_db),
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CurrentUser] = Depends(get_current_user),
 ):
     if not user:
         return RedirectResponse(url="/login?next=/add", status_code=303)
@@ -230,36 +320,19 @@ def handle_add_movie(
 def show_edit_movie_form(
     request: Request,
     movie_id: int,
-    db=Depends(get_db),
-    user: Optional[User] = Depends(get_current_user),
+    db=Depends(get_read_db),
+    user: Optional[CurrentUser] = Depends(get_current_user),
 ):
     if not user:
         return RedirectResponse(url=f"/login?next=/edit/{movie_id}", status_code=303)
 
     movie = db.query(Movie).filter(Movie.id == movie_id).first()
     if not movie:
-        movies = crud.get_movies(db)
-        return templates.TemplateResponse(
-            "index.html",
-            {
-                "request": request,
-                "movies": movies,
-                "message": "Movie not found",
-                "user": user,
-            },
-        )
+        return RedirectResponse(url="/", status_code=303)
 
-    directors = db.query(Director).all()
-    genres = db.query(Genre).all()
     return templates.TemplateResponse(
         "edit_movie.html",
-        {
-            "request": request,
-            "movie": movie,
-            "directors": directors,
-            "genres": genres,
-            "user": user,
-        },
+        {"request": request, "movie": movie, "user": user},
     )
 
 @app.post("/edit/{movie_id}", response_class=HTMLResponse)
@@ -273,7 +346,7 @@ def handle_edit_movie(
     genre_name: str = Form(""),
     image_url: str = Form(""),
     db=Depends(get_db),
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CurrentUser] = Depends(get_current_user),
 ):
     if not user:
         return RedirectResponse(url=f"/login?next=/edit/{movie_id}", status_code=303)
@@ -299,24 +372,15 @@ def handle_edit_movie(
 def show_delete_confirmation(
     request: Request,
     movie_id: int,
-    db=Depends(get_db),
-    user: Optional[User] = Depends(get_current_user),
+    db=Depends(get_read_db),
+    user: Optional[CurrentUser] = Depends(get_current_user),
 ):
     if not user:
         return RedirectResponse(url=f"/login?next=/delete/{movie_id}", status_code=303)
 
     movie = db.query(Movie).filter(Movie.id == movie_id).first()
     if not movie:
-        movies = crud.get_movies(db)
-        return templates.TemplateResponse(
-            "index.html",
-            {
-                "request": request,
-                "movies": movies,
-                "message": "Movie not found",
-                "user": user,
-            },
-        )
+        return RedirectResponse(url="/", status_code=303)
     return templates.TemplateResponse(
         "delete_movie.html",
         {"request": request, "movie": movie, "user": user},
@@ -327,27 +391,13 @@ def handle_delete_movie(
     request: Request,
     movie_id: int,
     db=Depends(get_db),
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CurrentUser] = Depends(get_current_user),
 ):
     if not user:
         return RedirectResponse(url=f"/login?next=/delete/{movie_id}", status_code=303)
 
-    success = crud.delete_movie(db, movie_id)
-    movies = crud.get_movies(db)
-    message = (
-        f"Movie with ID {movie_id} deleted successfully!"
-        if success
-        else "Movie not found."
-    )
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "movies": movies,
-            "message": message,
-            "user": user,
-        },
-    )
+    crud.delete_movie(db, movie_id)
+    return RedirectResponse(url="/", status_code=303)
 
 # ---------- Reviews & modal (HTML) ----------
 @app.post("/movies/{movie_id}/review")
@@ -371,9 +421,9 @@ def add_review(
 def get_movie_html(
     request: Request,
     movie_id: int,
-    db=Depends(get_db),
+    db=Depends(get_read_db),
     html: int = 0,
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CurrentUser] = Depends(get_current_user),
 ):
     movie = db.query(Movie).filter(Movie.id == movie_id).first()
 
@@ -387,12 +437,11 @@ def get_movie_html(
 
 # ----------------------------- API ROUTES (RESTFUL) -----------------------------
 @app.get("/api/movies", response_model=List[MovieOut])
-def api_get_movies(db=Depends(get_db)):
-    movies = crud.get_movies(db)
-    return [movie_to_out(m) for m in movies]
+def api_get_movies(db=Depends(get_read_db)):
+    return ORJSONResponse([row._asdict() for row in crud.get_movie_rows(db)])
 
 @app.get("/api/movies/{movie_id}", response_model=MovieOut)
-def api_get_movie(movie_id: int, db=Depends(get_db)):
+def api_get_movie(movie_id: int, db=Depends(get_read_db)):
     movie = crud.get_movie(db, movie_id)
     if not movie:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
@@ -1,8 +1,12 @@
 # ----------------------------- IMPORTS -----------------------------
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, Computed, Index, Integer, String, Text, ForeignKey, Table, event, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from database import Base
 
+# ----------------------------- EXTENSIONS -----------------------------
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 # ----------------------------- ASSOCIATION TABLES -----------------------------
 movie_genre_association = Table(
     "movie_genre_association",
@@ -37,6 +41,16 @@ class Director(Base):
     movies = relationship("Movie", back_populates="director")
     shows = relationship("Show", back_populates="director")
 
+    __table_args__ = (
+        Index("uq_director_name_lower", func.lower(name), unique=True),
+        Index(
+            "ix_director_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
 # ----------------------------- GENRE MODEL -----------------------------
 class Genre(Base):
     __tablename__ = "genres"
@@ -47,6 +61,16 @@ class Genre(Base):
     movies = relationship("Movie", secondary=movie_genre_association, back_populates="genres")
     shows = relationship("Show", secondary=show_genre_association, back_populates="genres")
 
+    __table_args__ = (
+        Index("uq_genre_name_lower", func.lower(name), unique=True),
+        Index(
+            "ix_genre_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
 # ----------------------------- MOVIE MODEL -----------------------------
 class Movie(Base):
     __tablename__ = "movies"
@@ -57,11 +81,22 @@ class Movie(Base):
     description = Column(Text)
     image_url = Column(String)
     director_id = Column(Integer, ForeignKey("directors.id"))
+    search_vec = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+    ))
 
     director = relationship("Director", back_populates="movies")
     genres = relationship("Genre", secondary=movie_genre_association, back_populates="movies")
     reviews = relationship("Review", back_populates="movie", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_movie_search", "search_vec", postgresql_using="gin"),
+    )
+
 # ----------------------------- REVIEW MODEL -----------------------------
 class Review(Base):
     __tablename__ = "reviews"
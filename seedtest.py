@@ -1,52 +1,77 @@
 # ----------------------------- IMPORTS -----------------------------
+from sqlalchemy import insert, select
+
+from auth import hash_password
 from database import SessionLocal
-from models import Director, Genre, Movie, Review, Show, User
-import hashlib
+from models import (
+    Director,
+    Genre,
+    Movie,
+    Review,
+    Show,
+    User,
+    movie_genre_association,
+    show_genre_association,
+)
 
-# ----------------------------- PASSWORD HELPERS -----------------------------
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+# ----------------------------- HELPERS -----------------------------
+def insert_rows(db, model, rows):
+    return db.scalars(
+        insert(model).returning(model.id, sort_by_parameter_order=True), rows
+    ).all()
 
 # ----------------------------- MAIN SEED FUNCTION -----------------------------
 def main():
     db = SessionLocal()
     try:
-        nolan = Director(name="Christopher Nolan", birth_date="1970-07-30")
-        sci_fi = Genre(name="Sci-Fi")
-
-        inception = Movie(
-            title="Inception",
-            year=2010,
-            description="A thief who steals corporate secrets through dream-sharing.",
-            director=nolan,
-            genres=[sci_fi],
-        )
-
-        review = Review(
-            user_name="Amanda",
-            rating=5,
-            comment="Mind-bending classic!",
-            movie=inception,
-        )
-
-        dark = Show(
-            title="Dark",
-            year=2017,
-            description="A family saga with a time-travel twist.",
-            director=nolan,
-            genres=[sci_fi],
-        )
-
-        admin = User(
-            username="admin",
-            password_hash=hash_password("admin123"),
-        )
-
-        db.add_all([nolan, sci_fi, inception, review, dark, admin])
+        [nolan_id] = insert_rows(db, Director, [
+            {"name": "Christopher Nolan", "birth_date": "1970-07-30"},
+        ])
+        [sci_fi_id] = insert_rows(db, Genre, [
+            {"name": "Sci-Fi"},
+        ])
+
+        [inception_id] = insert_rows(db, Movie, [
+            {
+                "title": "Inception",
+                "year": 2010,
+                "description": "A thief who steals corporate secrets through dream-sharing.",
+                "director_id": nolan_id,
+            },
+        ])
+        db.execute(insert(movie_genre_association), [
+            {"movie_id": inception_id, "genre_id": sci_fi_id},
+        ])
+
+        db.execute(insert(Review), [
+            {
+                "user_name": "Amanda",
+                "rating": 5,
+                "comment": "Mind-bending classic!",
+                "movie_id": inception_id,
+            },
+        ])
+
+        [dark_id] = insert_rows(db, Show, [
+            {
+                "title": "Dark",
+                "year": 2017,
+                "description": "A family saga with a time-travel twist.",
+                "director_id": nolan_id,
+            },
+        ])
+        db.execute(insert(show_genre_association), [
+            {"show_id": dark_id, "genre_id": sci_fi_id},
+        ])
+
+        db.execute(insert(User), [
+            {"username": "admin", "password_hash": hash_password("admin123")},
+        ])
+
         db.commit()
 
-        movies = db.query(Movie).all()
-        print("Movies:", [m.title for m in movies])
+        titles = db.scalars(select(Movie.title)).all()
+        print("Movies:", titles)
 
     except Exception as e:
         print("❌ Error:", e)